@@ -1,4 +1,9 @@
 # image_processor.py
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 import easyocr
@@ -18,6 +23,121 @@ class SudokuImageProcessor:
         Returns:
             list: matriz 9x9 con el sudoku (0 para celdas vacías)
         """
+        # Localizar y transformar perspectiva
+        sudoku_transformado = self._localizar_sudoku(imagen)
+
+        # Extraer números
+        sudoku_array = self._extraer_numeros(sudoku_transformado)
+
+        return sudoku_array
+
+    def extraer_sudokus(self, imagen, area_minima=0.01):
+        """
+        Detecta todos los sudokus de una imagen (por ejemplo, una página de diario)
+
+        La imagen se preprocesa una sola vez y las celdas de todas las grillas
+        pasan juntas por las rondas de OCR de _extraer_numeros_lote.
+
+        Args:
+            imagen: numpy array (BGR) de la imagen
+            area_minima: área mínima de una grilla, como fracción del área de la imagen
+
+        Returns:
+            list: tuplas (sudoku, esquinas) en orden de lectura, donde sudoku es la
+                  matriz 9x9 y esquinas son los 4 puntos [x, y] de la grilla en la imagen,
+                  en orden: arriba-izquierda, arriba-derecha, abajo-derecha, abajo-izquierda
+        """
+        umbral = self._umbralizar(imagen)
+        grillas = self._buscar_grillas(umbral, area_minima)
+
+        if not grillas:
+            raise ValueError("No se pudo detectar ningún sudoku en la imagen")
+
+        # Transformar perspectiva de cada grilla
+        transformados = [self._transformar_perspectiva(imagen, aproximacion) for aproximacion in grillas]
+
+        # Extraer números de todas las grillas a la vez
+        sudokus = self._extraer_numeros_lote(transformados)
+
+        return [(sudoku, self._ordenar_esquinas(aproximacion).tolist())
+                for sudoku, aproximacion in zip(sudokus, grillas)]
+
+    def extraer_lote(self, imagenes, hilos=4, tamaño_lote=8):
+        """
+        Extrae varios sudokus a la vez (por ejemplo, las páginas de un libro escaneado)
+
+        La lectura, detección y transformación de cada imagen corren en un pool de
+        hilos mientras el OCR lee las celdas del lote anterior, así que el OCR no
+        espera a que se decodifiquen las páginas.
+
+        Args:
+            imagenes: iterable de rutas de archivo o numpy arrays (BGR)
+            hilos: cantidad de hilos para leer, detectar y transformar imágenes
+            tamaño_lote: cantidad de imágenes que se entregan juntas al OCR
+
+        Yields:
+            tuple: (indice, sudoku, error) a medida que se termina cada lote.
+                   sudoku es la matriz 9x9, o None si la imagen falló (y error
+                   tiene el motivo)
+        """
+        if hilos < 1:
+            raise ValueError(f"hilos debe ser al menos 1 (se recibió {hilos})")
+        if tamaño_lote < 1:
+            raise ValueError(f"tamaño_lote debe ser al menos 1 (se recibió {tamaño_lote})")
+
+        iterador = enumerate(imagenes)
+        en_vuelo = deque()
+
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            while True:
+                # Mantener el pool ocupado con el lote siguiente mientras corre el OCR
+                for indice, imagen in iterador:
+                    en_vuelo.append((indice, pool.submit(self._preparar_imagen, imagen)))
+                    if len(en_vuelo) >= 2 * tamaño_lote:
+                        break
+
+                if not en_vuelo:
+                    break
+
+                lote = [en_vuelo.popleft() for _ in range(min(tamaño_lote, len(en_vuelo)))]
+                yield from self._reconocer_lote(lote)
+
+    def _preparar_imagen(self, imagen):
+        """Lee la imagen si hace falta y devuelve el sudoku transformado"""
+        if isinstance(imagen, (str, os.PathLike)):
+            imagen = self._leer_imagen(imagen)
+        return self._localizar_sudoku(imagen)
+
+    def _leer_imagen(self, ruta):
+        """Decodifica una imagen desde disco mapeando el archivo en memoria"""
+        datos = np.memmap(ruta, dtype=np.uint8, mode='r')
+        imagen = cv2.imdecode(datos, cv2.IMREAD_COLOR)
+        del datos
+
+        if imagen is None:
+            raise ValueError(f"No se pudo leer la imagen {ruta}")
+
+        return imagen
+
+    def _reconocer_lote(self, lote):
+        """Lee las celdas de un lote de imágenes ya transformadas"""
+        indices = []
+        transformados = []
+
+        for indice, futuro in lote:
+            try:
+                transformados.append(futuro.result())
+                indices.append(indice)
+            except (ValueError, OSError, cv2.error) as e:
+                yield indice, None, str(e)
+
+        sudokus = self._extraer_numeros_lote(transformados)
+
+        for indice, sudoku in zip(indices, sudokus):
+            yield indice, sudoku, None
+
+    def _umbralizar(self, imagen):
+        """Binariza la imagen completa para buscar el contorno de las grillas"""
         # Normalizar colores primero (eliminar fondos de color)
         # Convertir a escala de grises de manera más robusta
         if len(imagen.shape) == 3:
@@ -34,6 +154,12 @@ class SudokuImageProcessor:
         umbral = cv2.adaptiveThreshold(blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
                                         cv2.THRESH_BINARY_INV, 11, 2)
         
+        return umbral
+
+    def _localizar_sudoku(self, imagen):
+        """Encuentra el sudoku en la imagen y lo devuelve con la perspectiva corregida"""
+        umbral = self._umbralizar(imagen)
+        
         # Encontrar contornos y el sudoku
         contornos, _ = cv2.findContours(umbral, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         contorno_sudoku = max(contornos, key=cv2.contourArea)
@@ -46,15 +172,96 @@ class SudokuImageProcessor:
             raise ValueError(f"No se pudo detectar el sudoku correctamente. Se encontraron {len(aproximacion)} esquinas en vez de 4")
         
         # Transformar perspectiva
-        sudoku_transformado = self._transformar_perspectiva(imagen, aproximacion)
-        
-        # Extraer números
-        sudoku_array = self._extraer_numeros(sudoku_transformado)
+        return self._transformar_perspectiva(imagen, aproximacion)
+
+    def _buscar_grillas(self, umbral, area_minima):
+        """Devuelve las aproximaciones de 4 esquinas de todas las grillas candidatas"""
+        area_imagen = umbral.shape[0] * umbral.shape[1]
+        
+        # Una sola pasada de contornos para toda la imagen. Se usan también los
+        # contornos internos: en un diario la grilla suele estar dentro de un recuadro
+        contornos, _ = cv2.findContours(umbral, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        
+        candidatos = []
+        for contorno in contornos:
+            if cv2.contourArea(contorno) < area_minima * area_imagen:
+                continue
+            
+            # Detectar esquinas
+            perimetro = cv2.arcLength(contorno, True)
+            aproximacion = cv2.approxPolyDP(contorno, 0.02 * perimetro, True)
+            
+            if len(aproximacion) != 4 or not cv2.isContourConvex(aproximacion):
+                continue
+            
+            # Un sudoku es aproximadamente cuadrado (descarta columnas de texto, fotos, etc.)
+            _, _, ancho, alto = cv2.boundingRect(aproximacion)
+            if not 0.5 <= ancho / alto <= 2:
+                continue
+            
+            # Descartar recuadros, fotos y avisos que no tienen las líneas de una grilla 9x9
+            if not self._parece_grilla(umbral, aproximacion):
+                continue
+            
+            candidatos.append(aproximacion)
+        
+        # Si un candidato contiene a otro (recuadro y grilla, o los dos bordes de
+        # una línea gruesa), quedarse con el más interno
+        grillas = []
+        for aproximacion in candidatos:
+            contiene_otro = False
+            for otro in candidatos:
+                if otro is aproximacion or cv2.contourArea(otro) >= cv2.contourArea(aproximacion):
+                    continue
+                x, y, ancho, alto = cv2.boundingRect(otro)
+                centro = (x + ancho / 2, y + alto / 2)
+                if cv2.pointPolygonTest(aproximacion, centro, False) >= 0:
+                    contiene_otro = True
+                    break
+            if not contiene_otro:
+                grillas.append(aproximacion)
+        
+        return self._ordenar_lectura(grillas)
+
+    def _parece_grilla(self, umbral, aproximacion):
+        """Verifica que el cuadrilátero tenga las 8 líneas internas de un sudoku en cada sentido"""
+        grilla = self._transformar_perspectiva(umbral, aproximacion) > 127
         
-        return sudoku_array
+        lado = 450
+        tamaño_celda = lado // 9
+        banda = 4
+        
+        lineas = 0
+        for k in range(1, 9):
+            posicion = k * tamaño_celda
+            # Fracción de píxeles blancos de la mejor columna/fila cerca de cada línea esperada
+            vertical = grilla[:, posicion - banda:posicion + banda].mean(axis=0).max()
+            horizontal = grilla[posicion - banda:posicion + banda, :].mean(axis=1).max()
+            lineas += int(vertical > 0.5) + int(horizontal > 0.5)
+        
+        # Tolerar alguna línea mal umbralizada
+        return lineas >= 14
+
+    def _ordenar_lectura(self, grillas):
+        """Ordena las grillas por filas (de arriba hacia abajo) y cada fila de izquierda a derecha"""
+        cajas = sorted(((cv2.boundingRect(aproximacion), aproximacion) for aproximacion in grillas),
+                       key=lambda item: item[0][1])
+        
+        filas = []
+        for caja, aproximacion in cajas:
+            _, y, _, _ = caja
+            # Una grilla está en la misma fila si empieza antes de la mitad de la primera de la fila
+            if filas and y < filas[-1][0][0][1] + filas[-1][0][0][3] / 2:
+                filas[-1].append((caja, aproximacion))
+            else:
+                filas.append([(caja, aproximacion)])
+        
+        return [aproximacion
+                for fila in filas
+                for _, aproximacion in sorted(fila, key=lambda item: item[0][0])]
     
-    def _transformar_perspectiva(self, imagen, aproximacion):
-        """Corrige la perspectiva del sudoku"""
+    def _ordenar_esquinas(self, aproximacion):
+        """Devuelve las 4 esquinas en orden: arriba-izq, arriba-der, abajo-der, abajo-izq"""
         esquinas = aproximacion.reshape(4, 2)
         
         suma = esquinas.sum(axis=1)
@@ -65,7 +272,11 @@ class SudokuImageProcessor:
         arriba_der = esquinas[np.argmin(diff)]
         abajo_izq = esquinas[np.argmax(diff)]
         
-        pts_origen = np.float32([arriba_izq, arriba_der, abajo_der, abajo_izq])
+        return np.array([arriba_izq, arriba_der, abajo_der, abajo_izq])
+    
+    def _transformar_perspectiva(self, imagen, aproximacion):
+        """Corrige la perspectiva del sudoku"""
+        pts_origen = np.float32(self._ordenar_esquinas(aproximacion))
         
         lado = 450
         pts_destino = np.float32([[0, 0], [lado, 0], [lado, lado], [0, lado]])
@@ -77,92 +288,122 @@ class SudokuImageProcessor:
     
     def _extraer_numeros(self, sudoku_transformado):
         """Extrae los números de cada celda usando OCR"""
-        
+        return self._extraer_numeros_lote([sudoku_transformado])[0]
+
+    def _extraer_numeros_lote(self, sudokus_transformados):
+        """
+        Extrae los números de varios sudokus transformados
+
+        Cada celda tiene una lista de intentos (estrategias) que se prueban en
+        orden; en cada ronda se pasan a _leer_numeros las celdas de todos los
+        sudokus que todavía no tienen número.
+        """
+        sudokus = [[[0] * 9 for _ in range(9)] for _ in sudokus_transformados]
+        intentos = {}
+
+        for indice, sudoku_transformado in enumerate(sudokus_transformados):
+            umbral, gris_procesado = self._preprocesar_celdas(sudoku_transformado)
+
+            lado = 450
+            tamaño_celda = lado // 9
+
+            for fila in range(9):
+                for columna in range(9):
+                    y1 = fila * tamaño_celda
+                    y2 = (fila + 1) * tamaño_celda
+                    x1 = columna * tamaño_celda
+                    x2 = (columna + 1) * tamaño_celda
+
+                    # Extraer celda de ambas versiones
+                    celda_umbral = umbral[y1:y2, x1:x2]
+                    celda_gris = gris_procesado[y1:y2, x1:x2]
+
+                    margen = 5
+                    celda_umbral_limpia = celda_umbral[margen:-margen, margen:-margen]
+                    celda_gris_limpia = celda_gris[margen:-margen, margen:-margen]
+
+                    # Detectar si hay contenido
+                    pixeles_blancos = cv2.countNonZero(celda_umbral_limpia)
+                    area_celda = celda_umbral_limpia.shape[0] * celda_umbral_limpia.shape[1]
+                    porcentaje = (pixeles_blancos / area_celda) * 100
+
+                    intentos_celda = []
+
+                    # Rango más flexible para detectar números
+                    if porcentaje > 3 and porcentaje < 65:
+                        # Determinar si es número delgado (posiblemente 1 o 7)
+                        es_delgado = porcentaje < 10
+
+                        # ESTRATEGIA 1: Probar con versión umbralizada
+                        intentos_celda.append((celda_umbral_limpia, True, es_delgado))
+
+                        # ESTRATEGIA 2: Si falla, probar con versión en escala de grises
+                        intentos_celda.append((celda_gris_limpia, False, es_delgado))
+
+                        # ESTRATEGIA 3: Si todavía falla y hay bastante contenido, sin margen
+                        if porcentaje > 8:
+                            intentos_celda.append((celda_gris[2:-2, 2:-2], False, False))
+
+                    # CASO ESPECIAL: Porcentaje muy bajo (1-3%) puede ser un "1" muy delgado
+                    elif porcentaje >= 1 and porcentaje <= 3:
+                        # El "1" es muy delgado, intentar con menos margen
+                        intentos_celda.append((celda_gris[1:-1, 1:-1], False, True))
+
+                    if intentos_celda:
+                        intentos[(indice, fila, columna)] = intentos_celda
+
+        # Probar las estrategias por rondas, con las celdas pendientes de todos los sudokus
+        ronda = 0
+        while True:
+            pendientes = [clave for clave, lista in intentos.items()
+                          if ronda < len(lista) and sudokus[clave[0]][clave[1]][clave[2]] == 0]
+            if not pendientes:
+                break
+
+            numeros = self._leer_numeros([intentos[clave][ronda] for clave in pendientes])
+            for (indice, fila, columna), numero in zip(pendientes, numeros):
+                sudokus[indice][fila][columna] = numero
+
+            ronda += 1
+
+        # Validar que los sudokus detectados sean válidos
+        for sudoku_array in sudokus:
+            if not self._validar_sudoku(sudoku_array):
+                # A stderr, para no mezclarse con la salida de lote.py
+                print("⚠️ ADVERTENCIA: El sudoku detectado tiene conflictos (números repetidos)", file=sys.stderr)
+
+        return sudokus
+
+    def _preprocesar_celdas(self, sudoku_transformado):
+        """Prepara el sudoku transformado para dividirlo en celdas"""
+
         # PASO 1: Convertir a escala de grises
         if len(sudoku_transformado.shape) == 3:
             gris = cv2.cvtColor(sudoku_transformado, cv2.COLOR_BGR2GRAY)
         else:
             gris = sudoku_transformado
-        
+
         # PASO 2: Usar CLAHE para mejorar contraste local
         # Esto funciona MUCHO mejor con fondos de color
         clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
         gris = clahe.apply(gris)
-        
+
         # PASO 3: Preprocesamiento GLOBAL (antes de dividir en celdas)
         # Blur suave
         blur = cv2.GaussianBlur(gris, (5, 5), 0)
-        
+
         # Umbral adaptativo en toda la imagen (no por celda)
         # Esto mantiene mejor el contraste en áreas con fondo de color
-        umbral = cv2.adaptiveThreshold(blur, 255, 
-                                       cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+        umbral = cv2.adaptiveThreshold(blur, 255,
+                                       cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                                        cv2.THRESH_BINARY_INV, 11, 2)
-        
+
         # PASO 4: Guardar también la versión en escala de grises procesada
         # para usar como backup en OCR
         gris_procesado = gris.copy()
-        
-        sudoku_array = []
-        lado = 450
-        tamaño_celda = lado // 9
-        
-        for fila in range(9):
-            fila_sudoku = []
-            for columna in range(9):
-                y1 = fila * tamaño_celda
-                y2 = (fila + 1) * tamaño_celda
-                x1 = columna * tamaño_celda
-                x2 = (columna + 1) * tamaño_celda
-                
-                # Extraer celda de ambas versiones
-                celda_umbral = umbral[y1:y2, x1:x2]
-                celda_gris = gris_procesado[y1:y2, x1:x2]
-                
-                margen = 5
-                celda_umbral_limpia = celda_umbral[margen:-margen, margen:-margen]
-                celda_gris_limpia = celda_gris[margen:-margen, margen:-margen]
-                
-                # Detectar si hay contenido
-                pixeles_blancos = cv2.countNonZero(celda_umbral_limpia)
-                area_celda = celda_umbral_limpia.shape[0] * celda_umbral_limpia.shape[1]
-                porcentaje = (pixeles_blancos / area_celda) * 100
-                
-                numero = 0
-                
-                # Rango más flexible para detectar números
-                if porcentaje > 3 and porcentaje < 65:
-                    # Determinar si es número delgado (posiblemente 1 o 7)
-                    es_delgado = porcentaje < 10
-                    
-                    # ESTRATEGIA 1: Probar con versión umbralizada
-                    numero = self._leer_numero(celda_umbral_limpia, engrosar=es_delgado)
-                    
-                    # ESTRATEGIA 2: Si falla, probar con versión en escala de grises
-                    if numero == 0:
-                        numero = self._leer_numero(celda_gris_limpia, usar_umbral=False, engrosar=es_delgado)
-                    
-                    # ESTRATEGIA 3: Si todavía falla y hay bastante contenido, sin margen
-                    if numero == 0 and porcentaje > 8:
-                        celda_sin_margen = celda_gris[2:-2, 2:-2]
-                        numero = self._leer_numero(celda_sin_margen, usar_umbral=False, engrosar=False)
-                
-                # CASO ESPECIAL: Porcentaje muy bajo (1-3%) puede ser un "1" muy delgado
-                elif porcentaje >= 1 and porcentaje <= 3:
-                    # El "1" es muy delgado, intentar con menos margen
-                    celda_margen_minimo = celda_gris[1:-1, 1:-1]
-                    numero = self._leer_numero(celda_margen_minimo, usar_umbral=False, engrosar=True)
-                
-                fila_sudoku.append(numero)
-            
-            sudoku_array.append(fila_sudoku)
-        
-        # Validar que el sudoku detectado sea válido
-        if not self._validar_sudoku(sudoku_array):
-            print("⚠️ ADVERTENCIA: El sudoku detectado tiene conflictos (números repetidos)")
-        
-        return sudoku_array
-    
+
+        return umbral, gris_procesado
+
     def _validar_sudoku(self, sudoku):
         """Verifica que no haya números repetidos en filas, columnas o cajas"""
         # Verificar filas
@@ -191,6 +432,24 @@ class SudokuImageProcessor:
         
         return True
     
+    def _leer_numeros(self, celdas):
+        """
+        Lee varias celdas con OCR
+
+        Es el único punto por donde pasan las lecturas de _extraer_numeros_lote.
+        Cada celda se lee con _leer_numero (detector + reconocedor de EasyOCR),
+        igual que en extraer_sudoku: EasyOCR en CPU reconoce de a una caja, así
+        que agruparlas no acelera la lectura.
+
+        Args:
+            celdas: lista de tuplas (celda, usar_umbral, engrosar)
+
+        Returns:
+            list: número leído para cada celda (0 si no se pudo leer)
+        """
+        return [self._leer_numero(celda, usar_umbral=usar_umbral, engrosar=engrosar)
+                for celda, usar_umbral, engrosar in celdas]
+
     def _leer_numero(self, celda, usar_umbral=True, engrosar=False):
         """Lee un número de una celda usando OCR"""
         # Si se pide, aplicar umbral OTSU
@@ -117,6 +117,113 @@ def resolver_completo(sudoku):
     return sudoku
 
 
+class EstadoSudoku:
+    """
+    Estado persistente de un sudoku para corregirlo de a una celda
+
+    Guarda los números dados y cuántas veces aparece cada número en cada fila,
+    columna y caja, así que poner o borrar un número solo actualiza esas tres
+    restricciones. La última solución se reutiliza mientras siga siendo válida.
+    """
+
+    def __init__(self, sudoku):
+        self.sudoku=[[0]*9 for _ in range(9)]
+        self.filas=[[0]*10 for _ in range(9)]
+        self.columnas=[[0]*10 for _ in range(9)]
+        self.cajas=[[0]*10 for _ in range(9)]
+        self._solucion=None
+        self._sin_solucion=False
+        for i in range(9):
+            for j in range(9):
+                if sudoku[i][j]!=0:
+                    self._sumar(i, j, sudoku[i][j], 1)
+
+    def _sumar(self, fila, columna, numero, cantidad):
+        caja=(fila//3)*3+columna//3
+        self.filas[fila][numero]+=cantidad
+        self.columnas[columna][numero]+=cantidad
+        self.cajas[caja][numero]+=cantidad
+        self.sudoku[fila][columna]=numero if cantidad>0 else 0
+
+    def poner(self, fila, columna, numero):
+        """Pone (o reemplaza) un número dado; 0 borra la celda"""
+        if numero==0:
+            self.borrar(fila, columna)
+            return
+        anterior=self.sudoku[fila][columna]
+        if anterior==numero:
+            return
+        if anterior!=0:
+            self._sumar(fila, columna, anterior, -1)
+            # Reemplazar un número quita una restricción: puede aparecer una solución
+            self._sin_solucion=False
+        self._sumar(fila, columna, numero, 1)
+        # La solución anterior sigue valiendo si ya tenía ese número en la celda
+        if self._solucion is not None and self._solucion[fila][columna]!=numero:
+            self._solucion=None
+
+    def borrar(self, fila, columna):
+        """Borra un número dado (la solución anterior sigue siendo válida)"""
+        anterior=self.sudoku[fila][columna]
+        if anterior!=0:
+            self._sumar(fila, columna, anterior, -1)
+            self._sin_solucion=False
+
+    def tiene_conflictos(self):
+        """True si algún número se repite en una fila, columna o caja"""
+        return any(cantidad>1 for grupo in (self.filas, self.columnas, self.cajas)
+                   for conteo in grupo for cantidad in conteo)
+
+    def candidatos(self, fila, columna):
+        """Números que se pueden poner en la celda sin repetir"""
+        caja=(fila//3)*3+columna//3
+        return [n for n in range(1,10)
+                if self.filas[fila][n]==0 and self.columnas[columna][n]==0 and self.cajas[caja][n]==0]
+
+    def resolver(self):
+        """Devuelve el sudoku resuelto, o None si no tiene solución"""
+        # No repetir una búsqueda que ya falló con las mismas restricciones
+        if self._solucion is None and not self._sin_solucion and not self.tiene_conflictos():
+            # Buscar sobre una copia de las restricciones ya calculadas
+            busqueda=EstadoSudoku.__new__(EstadoSudoku)
+            busqueda.sudoku=[fila[:] for fila in self.sudoku]
+            busqueda.filas=[conteo[:] for conteo in self.filas]
+            busqueda.columnas=[conteo[:] for conteo in self.columnas]
+            busqueda.cajas=[conteo[:] for conteo in self.cajas]
+            if busqueda._buscar():
+                self._solucion=busqueda.sudoku
+            else:
+                self._sin_solucion=True
+        if self._solucion is None:
+            return None
+        return [fila[:] for fila in self._solucion]
+
+    def _buscar(self):
+        # Elegir la celda vacía con menos candidatos
+        mejor_celda=None
+        mejores_candidatos=None
+        for i in range(9):
+            for j in range(9):
+                if self.sudoku[i][j]==0:
+                    opciones=self.candidatos(i, j)
+                    if mejores_candidatos is None or len(opciones)<len(mejores_candidatos):
+                        mejor_celda=(i,j)
+                        mejores_candidatos=opciones
+                        if len(opciones)<=1:
+                            break
+            if mejores_candidatos is not None and len(mejores_candidatos)<=1:
+                break
+        if mejor_celda is None:
+            return True
+        fila,columna=mejor_celda
+        for n in mejores_candidatos:
+            self._sumar(fila, columna, n, 1)
+            if self._buscar():
+                return True
+            self._sumar(fila, columna, n, -1)
+        return False
+
+
 # Solo ejecutar si se corre directamente (no cuando se importa)
 if __name__ == "__main__":
     sudoku=resolver_completo(sudoku)
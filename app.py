@@ -4,7 +4,7 @@ import cv2
 import numpy as np
 from PIL import Image
 from Imagen import SudokuImageProcessor
-from Solver import resolver_completo
+from Solver import EstadoSudoku
 
 st.set_page_config(page_title="Sudoku Solver", page_icon="🔢", layout="centered")
 
@@ -40,49 +40,73 @@ if archivo:
         st.subheader("Sudoku Original")
         st.image(imagen_pil, use_container_width=True)
     
+    # El resultado del OCR se guarda por archivo para no repetirlo en cada interacción
+    clave_archivo = archivo.file_id
+    if st.session_state.get("archivo") != clave_archivo:
+        st.session_state.archivo = clave_archivo
+        st.session_state.estado = None
+    
     # Botón para resolver
-    if st.button("🚀 Resolver Sudoku", type="primary"):
+    if st.button("🚀 Resolver Sudoku", type="primary") and st.session_state.estado is None:
         with st.spinner("Procesando imagen..."):
             try:
                 # Extraer sudoku de la imagen
                 sudoku_extraido = processor.extraer_sudoku(imagen)
-                
-                st.success("✅ Sudoku detectado correctamente")
-                
-                # Mostrar sudoku extraído
-                with st.expander("Ver sudoku extraído"):
-                    for fila in sudoku_extraido:
-                        st.text(" ".join(str(n) if n != 0 else "·" for n in fila))
-                
-                # Resolver
-                with st.spinner("Resolviendo..."):
-                    sudoku_resuelto = resolver_completo(sudoku_extraido)
-                
-                # Mostrar resultado
-                with col2:
-                    st.subheader("Sudoku Resuelto")
-                    
-                    # Crear visualización bonita del resultado
-                    resultado_html = "<div style='font-family: monospace; font-size: 20px;'>"
-                    for i, fila in enumerate(sudoku_resuelto):
-                        if i % 3 == 0 and i != 0:
-                            resultado_html += "<hr style='margin: 5px 0;'>"
-                        fila_str = ""
-                        for j, num in enumerate(fila):
-                            if j % 3 == 0 and j != 0:
-                                fila_str += " | "
-                            fila_str += f" {num} "
-                        resultado_html += f"<p style='margin: 2px;'>{fila_str}</p>"
-                    resultado_html += "</div>"
-                    
-                    st.markdown(resultado_html, unsafe_allow_html=True)
-                    st.success("🎉 ¡Sudoku resuelto!")
+                st.session_state.estado = EstadoSudoku(sudoku_extraido)
                 
             except ValueError as e:
                 st.error(f"❌ Error: {str(e)}")
             except Exception as e:
                 st.error(f"❌ Ocurrió un error inesperado: {str(e)}")
                 st.write("Asegurate de que la imagen tenga un sudoku claro y bien iluminado")
+    
+    estado = st.session_state.estado
+    
+    if estado is not None:
+        st.success("✅ Sudoku detectado correctamente")
+        
+        # Mostrar sudoku extraído y permitir corregir números mal leídos
+        with st.expander("Ver sudoku extraído"):
+            c1, c2, c3 = st.columns(3)
+            fila = c1.number_input("Fila", min_value=1, max_value=9, step=1)
+            columna = c2.number_input("Columna", min_value=1, max_value=9, step=1)
+            valor = c3.number_input("Número (0 para borrar)", min_value=0, max_value=9, step=1)
+            
+            if st.button("✏️ Corregir celda"):
+                estado.poner(int(fila) - 1, int(columna) - 1, int(valor))
+            
+            for fila_extraida in estado.sudoku:
+                st.text(" ".join(str(n) if n != 0 else "·" for n in fila_extraida))
+        
+        # Resolver (solo vuelve a buscar si la corrección invalidó la solución anterior)
+        with st.spinner("Resolviendo..."):
+            sudoku_resuelto = estado.resolver()
+        
+        # Mostrar resultado
+        with col2:
+            st.subheader("Sudoku Resuelto")
+            
+            if sudoku_resuelto is None:
+                if estado.tiene_conflictos():
+                    st.error("❌ El sudoku extraído tiene números repetidos. Corregilo en \"Ver sudoku extraído\"")
+                else:
+                    st.error("❌ El sudoku extraído no tiene solución. Revisá los números en \"Ver sudoku extraído\"")
+            else:
+                # Crear visualización bonita del resultado
+                resultado_html = "<div style='font-family: monospace; font-size: 20px;'>"
+                for i, fila_resuelta in enumerate(sudoku_resuelto):
+                    if i % 3 == 0 and i != 0:
+                        resultado_html += "<hr style='margin: 5px 0;'>"
+                    fila_str = ""
+                    for j, num in enumerate(fila_resuelta):
+                        if j % 3 == 0 and j != 0:
+                            fila_str += " | "
+                        fila_str += f" {num} "
+                    resultado_html += f"<p style='margin: 2px;'>{fila_str}</p>"
+                resultado_html += "</div>"
+                
+                st.markdown(resultado_html, unsafe_allow_html=True)
+                st.success("🎉 ¡Sudoku resuelto!")
 
 else:
     st.info("👆 Subí una imagen para empezar")
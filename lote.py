@@ -0,0 +1,66 @@
+# lote.py - Extrae todos los sudokus de una carpeta (por ejemplo, un libro escaneado)
+import argparse
+import json
+import os
+import sys
+
+from Imagen import SudokuImageProcessor
+
+EXTENSIONES = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+
+def listar_imagenes(carpeta):
+    """Devuelve las rutas de las imágenes de la carpeta, ordenadas por nombre"""
+    return sorted(
+        os.path.join(carpeta, nombre)
+        for nombre in os.listdir(carpeta)
+        if nombre.lower().endswith(EXTENSIONES)
+    )
+
+
+def entero_positivo(texto):
+    """Tipo de argparse para enteros mayores o iguales a 1"""
+    valor = int(texto)
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"debe ser al menos 1 (se recibió {valor})")
+    return valor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrae los sudokus de todas las imágenes de una carpeta")
+    parser.add_argument("carpeta", help="carpeta con las imágenes (una página por imagen)")
+    parser.add_argument("-o", "--salida", help="archivo JSON Lines de salida (por defecto, la consola)")
+    parser.add_argument("--hilos", type=entero_positivo, default=4, help="hilos para leer y transformar imágenes")
+    parser.add_argument("--lote", type=entero_positivo, default=8, help="imágenes que se entregan juntas al OCR")
+    args = parser.parse_args()
+
+    rutas = listar_imagenes(args.carpeta)
+    if not rutas:
+        print(f"No se encontraron imágenes en {args.carpeta}", file=sys.stderr)
+        return 1
+
+    processor = SudokuImageProcessor()
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+
+    errores = 0
+    try:
+        # Cada sudoku se escribe apenas termina su lote
+        for indice, sudoku, error in processor.extraer_lote(rutas, hilos=args.hilos, tamaño_lote=args.lote):
+            if error is not None:
+                errores += 1
+                print(f"❌ {rutas[indice]}: {error}", file=sys.stderr)
+                continue
+
+            salida.write(json.dumps({"imagen": rutas[indice], "sudoku": sudoku}) + "\n")
+            salida.flush()
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+    print(f"✓ {len(rutas) - errores} de {len(rutas)} sudokus extraídos", file=sys.stderr)
+    # Código distinto de 0 si alguna página falló, para detectar corridas parciales
+    return 2 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())